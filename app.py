@@ -6,8 +6,10 @@ from io import BytesIO
 import numpy as np
 import html
 import glob
+import importlib.util
 import os
 import re
+import uuid
 from datetime import datetime, timedelta
 
 # ページ設定
@@ -21,51 +23,45 @@ st.title("🔥 Industry Buy Pressure Dashboard")
 st.markdown("---")
 
 
-def get_color_from_buy_pressure(buy_pressure):
-    if pd.isna(buy_pressure):
-        return "#808080"
-    normalized = max(0.0, min(1.0, buy_pressure))
-    if normalized >= 0.5:
-        ratio = (normalized - 0.5) * 2
-        r = int(255 * (1 - ratio))
-        g = 255
-        b = 0
-    else:
-        ratio = normalized * 2
-        r = 255
-        g = int(255 * ratio)
-        b = 0
-    return f"#{r:02x}{g:02x}{b:02x}"
-
-
-def get_buy_pressure_status(buy_pressure):
-    if buy_pressure > 0.667:
-        return "3 🔥 EXTREME"
-    elif buy_pressure > 0.60:
-        return "2 🚀 STRONG"
-    elif buy_pressure > 0.55:
-        return "1 📈 BUY"
-    elif buy_pressure < 0.333:
-        return "0a 💀 WEAK"
-    elif buy_pressure < 0.45:
-        return "0b ⚠️ CAUTION"
-    else:
-        return "0c ➖ NEUTRAL"
-
-
-def get_buy_pressure_status_display(buy_pressure):
-    if buy_pressure > 0.667:
-        return "🔥 EXTREME"
-    elif buy_pressure > 0.60:
-        return "🚀 STRONG"
-    elif buy_pressure > 0.55:
-        return "📈 BUY"
-    elif buy_pressure < 0.333:
-        return "💀 WEAK"
-    elif buy_pressure < 0.45:
-        return "⚠️ CAUTION"
-    else:
-        return "➖ NEUTRAL"
+# Buy Pressure のカラーは赤(#ff0000)→黄(#ffff00)→緑(#00ff00)の 511 段階しかないため、
+# 段階番号 (0〜510) → 16進カラー文字列のルックアップテーブルを事前に作っておく
+BUY_PRESSURE_COLOR_LUT = np.array(
+    [f"#ff{level:02x}00" for level in range(256)]
+    + [f"#{510 - level:02x}ff00" for level in range(256, 511)],
+    dtype=object,
+)
+
+
+def get_colors_from_buy_pressure(buy_pressure):
+    """Buy Pressure の配列 → 赤→黄→緑の 16 進カラー文字列の配列 (NumPy で段階番号を求めて LUT を引く。欠損は灰色)"""
+    bp = np.asarray(buy_pressure, dtype=float)
+    missing = np.isnan(bp)
+    normalized = np.clip(np.where(missing, 0.0, bp), 0.0, 1.0)
+    level = np.where(
+        normalized >= 0.5,
+        510 - (255 * (1 - (normalized - 0.5) * 2)).astype(int),
+        (255 * (normalized * 2)).astype(int),
+    )
+    return np.where(missing, "#808080", BUY_PRESSURE_COLOR_LUT[level])
+
+
+# 判定順に並べたステータス名 (最後は既定値)。表示用は先頭の並び替え用番号を除いたもの
+BUY_PRESSURE_STATUS_LABELS = (
+    "3 🔥 EXTREME", "2 🚀 STRONG", "1 📈 BUY", "0a 💀 WEAK", "0b ⚠️ CAUTION", "0c ➖ NEUTRAL"
+)
+BUY_PRESSURE_STATUS_DISPLAY = {label: label.split(' ', 1)[1] for label in BUY_PRESSURE_STATUS_LABELS}
+# ステータス名の先頭の並び替え用番号 ("0a " など)
+STATUS_SORT_PREFIX_PATTERN = re.compile(r'^\d+[a-z]?\s+')
+
+
+def get_buy_pressure_statuses(buy_pressure):
+    """Buy Pressure の配列からステータス名を NumPy で一括判定する (表示用は BUY_PRESSURE_STATUS_DISPLAY で変換)"""
+    bp = np.asarray(buy_pressure, dtype=float)
+    return np.select(
+        [bp > 0.667, bp > 0.60, bp > 0.55, bp < 0.333, bp < 0.45],
+        BUY_PRESSURE_STATUS_LABELS[:-1],
+        default=BUY_PRESSURE_STATUS_LABELS[-1],
+    ).astype(object)
 
 
 CUSTOM_RS_COLORSCALE = [
@@ -77,6 +73,11 @@ CUSTOM_RS_COLORSCALE = [
 ]
 
 
+# ファイル名末尾の YYYYMMDD_HHMMSS (最新判定用) と、その日付部分 (データ日付用)
+FILE_TIMESTAMP_PATTERN = re.compile(r'(\d{8}_\d{6})\.xlsx$')
+FILE_DATE_PATTERN = re.compile(r'(\d{8})_\d{6}')
+
+
 def find_latest_file(directory, prefix):
     pattern = os.path.join(directory, f"{prefix}*.xlsx")
     matched_files = glob.glob(pattern)
@@ -84,11 +85,10 @@ def find_latest_file(directory, prefix):
         raise FileNotFoundError(
             f"'{directory}/' 内に '{prefix}*.xlsx' に一致するファイルが見つかりません。"
         )
-    date_pattern = re.compile(r'(\d{8}_\d{6})\.xlsx$')
     files_with_dates = []
     for filepath in matched_files:
         filename = os.path.basename(filepath)
-        match = date_pattern.search(filename)
+        match = FILE_TIMESTAMP_PATTERN.search(filename)
         if match:
             files_with_dates.append((filepath, match.group(1)))
     if not files_with_dates:
@@ -100,7 +100,7 @@ def find_latest_file(directory, prefix):
 
 
 def get_data_date_from_filename(filename):
-    match = re.search(r'(\d{8})_\d{6}', filename)
+    match = FILE_DATE_PATTERN.search(filename)
     if match:
         file_date = datetime.strptime(match.group(1), '%Y%m%d')
         data_date = file_date - timedelta(days=1)
@@ -108,35 +108,104 @@ def get_data_date_from_filename(filename):
     return "不明"
 
 
-@st.cache_data
-def load_data():
-    DATA_DIR = "data"
-    file1_path = find_latest_file(DATA_DIR, "industry_etf_multicondition_")
-    file2_path = find_latest_file(DATA_DIR, "integrated_screening_")
-    file1_name = os.path.basename(file1_path)
-    data_date = get_data_date_from_filename(file1_name)
+DATA_DIR = "data"
+# xlsx の解析は Rust 実装の calamine を優先し、未導入の環境では openpyxl を使う
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+SCREENING_COLUMNS = [
+    'Symbol', 'Industry', 'Technical_Score', 'Screening_Score', 'Buy_Pressure', 'Company Name'
+]
+
+
+# Parquet キャッシュは xlsx と混ざらないよう data/.cache/ にまとめて置く
+PARQUET_CACHE_DIR_NAME = ".cache"
+PARQUET_CACHE_SUFFIXES = ("industry", "all_industry", "screening")
+
+
+def get_parquet_path(xlsx_path, suffix):
+    """xlsx に対応する Parquet キャッシュのパス (xlsx と同じディレクトリの .cache/ 以下)"""
+    stem = os.path.splitext(os.path.basename(xlsx_path))[0]
+    return os.path.join(os.path.dirname(xlsx_path), PARQUET_CACHE_DIR_NAME, f"{stem}_{suffix}.parquet")
 
-    xl = pd.ExcelFile(file1_path)
+
+def is_parquet_cache_fresh(parquet_path, xlsx_path):
+    """Parquet キャッシュが存在し、元の xlsx 以降に書き込まれたものなら True"""
+    return os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(xlsx_path)
+
+
+def read_parquet_cache(parquet_path, **kwargs):
+    """Parquet キャッシュを読む。壊れている等で読めなければ None を返し、呼び出し側で xlsx から読み直す"""
+    try:
+        return pd.read_parquet(parquet_path, **kwargs)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def remove_stale_parquet_caches(data_dir):
+    # 元の xlsx が削除された Parquet キャッシュを掃除する (.cache/ 内の自分で書いたものだけが対象)
+    cache_dir = os.path.join(data_dir, PARQUET_CACHE_DIR_NAME)
+    for parquet_path in glob.glob(os.path.join(cache_dir, "*.parquet")):
+        stem = os.path.splitext(os.path.basename(parquet_path))[0]
+        sources = [
+            os.path.join(data_dir, f"{stem[:-len(suffix) - 1]}.xlsx")
+            for suffix in PARQUET_CACHE_SUFFIXES if stem.endswith(f"_{suffix}")
+        ]
+        if sources and not any(os.path.exists(source) for source in sources):
+            try:
+                os.remove(parquet_path)
+            except OSError:
+                pass
+
+
+def write_parquet_cache(df, parquet_path):
+    # 一時ファイルに書き切ってから置き換えるので、途中で止まっても壊れたキャッシュは残らない。
+    # 一時ファイルは一意な名前で新規作成し、権限は通常のファイルと同じく umask に従わせる。
+    # 書き込みの失敗 (pyarrow 未導入・読み取り専用ディレクトリ等) は無視して xlsx 読み込みを継続
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+        tmp_path = f"{parquet_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "xb") as f:
+            df.to_parquet(f, index=False, compression="zstd")
+        os.replace(tmp_path, parquet_path)
+    except (ImportError, OSError, TypeError, ValueError):
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def read_industry_sheets(file1_path):
+    industry_path = get_parquet_path(file1_path, "industry")
+    all_industry_path = get_parquet_path(file1_path, "all_industry")
+    if is_parquet_cache_fresh(industry_path, file1_path) and is_parquet_cache_fresh(all_industry_path, file1_path):
+        df_industry = read_parquet_cache(industry_path)
+        df_all_industry = read_parquet_cache(all_industry_path)
+        if df_industry is not None and df_all_industry is not None:
+            return df_industry, df_all_industry
+
+    file1_name = os.path.basename(file1_path)
+    xl = pd.ExcelFile(file1_path, engine=EXCEL_ENGINE)
     sheet_names = xl.sheet_names
     df_industry = None
 
+    # ワークブックは一度だけ開き、各シートは同じ ExcelFile から parse する
     if 'Multi_Condition_Passed' in sheet_names:
-        df_raw = pd.read_excel(file1_path, sheet_name='Multi_Condition_Passed')
+        df_raw = xl.parse('Multi_Condition_Passed')
         if 'Industry' in df_raw.columns:
-            df_industry = df_raw.copy()
+            df_industry = df_raw
         else:
             industry_matches = df_raw[df_raw.iloc[:, 0] == 'Industry']
             if len(industry_matches) > 0:
+                # ヘッダー行以降をメモリ上で切り出す (再 parse しない)
                 header_row = industry_matches.index[0]
-                df_industry = pd.read_excel(
-                    file1_path, sheet_name='Multi_Condition_Passed', skiprows=header_row
-                )
-                df_industry.columns = df_industry.iloc[0]
-                df_industry = df_industry[1:].reset_index(drop=True)
+                df_industry = df_raw.iloc[header_row + 1:].reset_index(drop=True)
+                df_industry.columns = df_raw.iloc[header_row]
+                df_industry.columns.name = None
     else:
-        df_raw = pd.read_excel(file1_path, sheet_name=0)
+        df_raw = xl.parse(0)
         if 'Industry' in df_raw.columns:
-            df_industry = df_raw.copy()
+            df_industry = df_raw
 
     if df_industry is None:
         raise ValueError(f"'{file1_name}' から Industry データを読み取れませんでした。 シート名: {sheet_names}")
@@ -148,7 +217,7 @@ def load_data():
 
     df_all_industry = None
     if 'Full_Results' in sheet_names:
-        df_full = pd.read_excel(file1_path, sheet_name='Full_Results')
+        df_full = xl.parse('Full_Results')
         if 'Industry' in df_full.columns and 'Buy_Pressure' in df_full.columns:
             cols_to_use = ['Industry', 'Buy_Pressure']
             if 'RS_Rating' in df_full.columns:
@@ -161,24 +230,112 @@ def load_data():
     if df_all_industry is None:
         df_all_industry = df_industry.copy()
 
-    df_screening = pd.read_excel(file2_path, sheet_name='Screening_Results')
-    df_screening_filtered = df_screening[df_screening['Technical_Score'] >= 10].copy()
-    df_screening_filtered = df_screening_filtered[[
-        'Symbol', 'Industry', 'Technical_Score', 'Screening_Score', 'Buy_Pressure', 'Company Name'
-    ]].copy()
+    write_parquet_cache(df_industry, industry_path)
+    write_parquet_cache(df_all_industry, all_industry_path)
+    return df_industry, df_all_industry
 
-    industry_sector_map = {}
-    if 'Sector' in df_screening.columns and 'Industry' in df_screening.columns:
-        sector_df = df_screening[['Industry', 'Sector']].dropna().drop_duplicates()
-        for industry in sector_df['Industry'].unique():
-            sectors = sector_df[sector_df['Industry'] == industry]['Sector']
-            industry_sector_map[industry] = sectors.mode().iloc[0] if len(sectors) > 0 else 'Unknown'
 
-    return df_industry, df_all_industry, df_screening_filtered, industry_sector_map, data_date
+def read_screening_sheet(file2_path):
+    """Technical_Score >= 10 の銘柄データと、セクター対応表用の全銘柄の (Industry, Sector) を返す"""
+    parquet_path = get_parquet_path(file2_path, "screening")
+    if is_parquet_cache_fresh(parquet_path, file2_path):
+        # 列の絞り込みと Technical_Score >= 10 のフィルタは pyarrow の読み込み時に適用する
+        df_screening_filtered = read_parquet_cache(
+            parquet_path, columns=SCREENING_COLUMNS, filters=[('Technical_Score', '>=', 10)]
+        )
+        df_sector = read_parquet_cache(parquet_path, columns=['Industry', 'Sector'])
+        if df_screening_filtered is not None and df_sector is not None:
+            return df_screening_filtered, df_sector
+
+    # 使用する列 + Sector だけを読み込み、Parquet に保存 (Sector が無いファイルは空列として保存)
+    df_screening = pd.read_excel(
+        file2_path, sheet_name='Screening_Results', engine=EXCEL_ENGINE,
+        usecols=lambda col: col in SCREENING_COLUMNS or col == 'Sector',
+    )
+    if 'Sector' not in df_screening.columns:
+        df_screening['Sector'] = None
+    df_screening = df_screening[SCREENING_COLUMNS + ['Sector']]
+    write_parquet_cache(df_screening, parquet_path)
+    df_screening_filtered = df_screening.loc[
+        df_screening['Technical_Score'] >= 10, SCREENING_COLUMNS
+    ].reset_index(drop=True)
+    return df_screening_filtered, df_screening[['Industry', 'Sector']]
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def find_latest_data_files(data_dir_mtime):
+    """最新の (業種ファイル, スクリーニングファイル) のパス
+
+    ファイルの追加・削除でディレクトリの mtime が変わるため、それを引数にして
+    data/ に変化が無い再実行では glob をやり直さない。
+    """
+    return (
+        find_latest_file(DATA_DIR, "industry_etf_multicondition_"),
+        find_latest_file(DATA_DIR, "integrated_screening_"),
+    )
+
+
+# 読み込んだ DataFrame は全セッションで共有するため、呼び出し側では変更しないこと
+# (st.cache_resource は戻り値のハッシュ・pickle を行わない)。
+# ファイルパスと更新時刻がキーなので、新しいファイルが置かれた時や同名のまま上書きされた時は
+# 読み込み直し、古い結果は破棄する (file1_mtime / file2_mtime はキャッシュキー専用の引数)
+@st.cache_resource(max_entries=1)
+def load_data(file1_path, file2_path, file1_mtime, file2_mtime):
+    file1_name = os.path.basename(file1_path)
+    data_date = get_data_date_from_filename(file1_name)
+    remove_stale_parquet_caches(DATA_DIR)
+
+    df_industry, df_all_industry = read_industry_sheets(file1_path)
+
+    df_screening_filtered, df_sector = read_screening_sheet(file2_path)
+
+    # 業種 → セクター。1 業種に複数のセクターが付いている場合は名前順で先頭のものを使う
+    industry_sector_map = (
+        df_sector.dropna().sort_values('Sector', kind='stable')
+        .drop_duplicates('Industry').set_index('Industry')['Sector'].to_dict()
+    )
+
+    # スコアは小さな整数なので最小の整数型に落とす。Buy_Pressure / RS_Rating は
+    # ステータス判定のしきい値 (0.60 等) との厳密比較が変わらないよう float64 のまま
+    for col in ['Technical_Score', 'Screening_Score']:
+        df_screening_filtered[col] = pd.to_numeric(df_screening_filtered[col], downcast='integer')
+
+    # 表示用の社名は 40 文字で切り詰めた文字列として一度だけ用意しておく
+    df_screening_filtered['Company Name'] = (
+        df_screening_filtered['Company Name'].fillna('').astype(str).str[:40]
+    )
+    # 銘柄ごとの Buy Pressure カラーも読み込み時に一括計算し、描画時は列を参照するだけにする
+    df_screening_filtered['BP_Color'] = get_colors_from_buy_pressure(df_screening_filtered['Buy_Pressure'])
+    # 業種ごとのステータスとカラーも同様に読み込み時に求めておく
+    df_industry['Status'] = get_buy_pressure_statuses(df_industry['Buy_Pressure'])
+    df_industry['BP_Color'] = get_colors_from_buy_pressure(df_industry['Buy_Pressure'])
+    # HTML に埋め込むシンボル・社名のエスケープ済み文字列も一度だけ作っておく
+    df_screening_filtered['Symbol_HTML'] = df_screening_filtered['Symbol'].astype(str).map(html.escape)
+    df_screening_filtered['Company_Name_HTML'] = df_screening_filtered['Company Name'].map(html.escape)
+
+    # 業種名は繰り返しの多い文字列なので、両フレーム共通カテゴリの category 型にする
+    # (比較・isin・groupby が文字列ではなく整数コードで行われる)
+    industry_dtype = pd.CategoricalDtype(
+        pd.concat([df_industry['Industry'], df_screening_filtered['Industry']]).dropna().unique()
+    )
+    df_industry['Industry'] = df_industry['Industry'].astype(industry_dtype)
+    df_screening_filtered['Industry'] = df_screening_filtered['Industry'].astype(industry_dtype)
+
+    # サイドバーの選択肢はデータが変わらない限り同じなので、ここで一度だけ計算する
+    sidebar_options = {
+        'industries': sorted(df_industry['Industry'].dropna().unique()),
+        'max_tech_score': int(df_screening_filtered['Technical_Score'].max()),
+    }
+
+    return df_industry, df_all_industry, df_screening_filtered, industry_sector_map, data_date, sidebar_options
 
 
 try:
-    df_industry, df_all_industry, df_screening, industry_sector_map, data_date = load_data()
+    file1_path, file2_path = find_latest_data_files(os.path.getmtime(DATA_DIR))
+    # 同名での上書きはディレクトリの mtime を変えないことがあるため、ファイル自体の mtime は毎回取る
+    df_industry, df_all_industry, df_screening, industry_sector_map, data_date, sidebar_options = load_data(
+        file1_path, file2_path, os.path.getmtime(file1_path), os.path.getmtime(file2_path)
+    )
     st.success(f"✅ データ読み込み成功: {len(df_industry)} 業種 (条件通過), {len(df_all_industry)} 業種 (全体), {len(df_screening)} 銘柄")
     st.caption(f"📅 データ日付: **{data_date}**")
 except Exception as e:
@@ -190,13 +347,13 @@ with st.sidebar:
     st.header("📊 フィルター設定")
     min_tech_score = st.slider(
         "テクニカルスコア最小値", min_value=10,
-        max_value=int(df_screening['Technical_Score'].max()), value=10, step=1
+        max_value=sidebar_options['max_tech_score'], value=10, step=1
     )
     max_stocks_per_industry = st.slider(
         "業種ごとの最大表示銘柄数", min_value=5, max_value=30, value=15, step=5
     )
     selected_industries = st.multiselect(
-        "業種選択（空白=全て）", options=sorted(df_industry['Industry'].unique()), default=None
+        "業種選択（空白=全て）", options=sidebar_options['industries'], default=None
     )
     st.markdown("---")
     st.markdown("### 🎨 カラーコード")
@@ -205,175 +362,200 @@ with st.sidebar:
     st.markdown("- 🔴 **赤**: Buy Pressure 低い")
 
 
-df_screening_display = df_screening[df_screening['Technical_Score'] >= min_tech_score].copy()
-df_screening_display['Fundamental_Score'] = (
-    df_screening_display['Screening_Score'] - df_screening_display['Technical_Score']
+df_screening_display = df_screening[df_screening['Technical_Score'] >= min_tech_score]
+df_screening_display = df_screening_display.assign(
+    Fundamental_Score=df_screening_display['Screening_Score'] - df_screening_display['Technical_Score']
 )
 
 if selected_industries:
+    # 両フレームの Industry は同じカテゴリを共有しているので、選択業種をカテゴリコードに
+    # 一度だけ変換し、文字列ではなく整数コードで絞り込む
+    selected_codes = df_industry['Industry'].cat.categories.get_indexer(list(set(selected_industries)))
+    selected_codes = selected_codes[selected_codes >= 0]  # -1 (未登録) が欠損コードに一致しないように除外
     df_screening_display = df_screening_display[
-        df_screening_display['Industry'].isin(selected_industries)
+        np.isin(df_screening_display['Industry'].cat.codes.to_numpy(), selected_codes)
     ]
-    df_industry_display = df_industry[df_industry['Industry'].isin(selected_industries)].copy()
+    df_industry_display = df_industry[np.isin(df_industry['Industry'].cat.codes.to_numpy(), selected_codes)]
 else:
-    df_industry_display = df_industry.copy()
+    # 表示用の業種データは読み取り専用なので、キャッシュ済みの DataFrame をコピーせずそのまま使う
+    df_industry_display = df_industry
 
 
+# 以下の st.cache_data 付きの描画用関数はフィルター後の DataFrame をキャッシュキーにしており、
+# フィルター結果が同じ再実行 (表示の切り替え等) では計算済みの結果をそのまま返す
+@st.cache_data(show_spinner=False, max_entries=8)
 def create_summary_data(df_screening_disp, df_industry_disp):
-    industry_summary = []
-    for industry in df_industry_disp['Industry']:
-        stocks = df_screening_disp[df_screening_disp['Industry'] == industry]
-        industry_data = df_industry_disp[df_industry_disp['Industry'] == industry].iloc[0]
-        status = get_buy_pressure_status(industry_data['Buy_Pressure'])
-        industry_summary.append({
-            '業種': industry,
-            'RS Rating': industry_data['RS_Rating'],
-            'Buy Pressure': industry_data['Buy_Pressure'],
-            'ステータス': status,
-            '銘柄数': len(stocks),
-            '平均テクニカルスコア': stocks['Technical_Score'].mean() if len(stocks) > 0 else 0,
-            '平均スクリーニングスコア': stocks['Screening_Score'].mean() if len(stocks) > 0 else 0,
-        })
-    df_summary = pd.DataFrame(industry_summary)
+    # 業種ごとの銘柄数・平均スコアを一度の groupby で集計し、業種データに結合する
+    stock_stats = df_screening_disp.groupby('Industry', sort=False, observed=True).agg(
+        銘柄数=('Symbol', 'size'),
+        平均テクニカルスコア=('Technical_Score', 'mean'),
+        平均スクリーニングスコア=('Screening_Score', 'mean'),
+    )
+    df_merged = df_industry_disp[['Industry', 'RS_Rating', 'Buy_Pressure', 'Status', 'BP_Color']].join(
+        stock_stats, on='Industry'
+    )
+    df_merged = df_merged.reset_index(drop=True)
+    no_stocks = df_merged['銘柄数'].isna()
+    df_merged.loc[no_stocks, ['銘柄数', '平均テクニカルスコア', '平均スクリーニングスコア']] = 0
+    df_summary = pd.DataFrame({
+        '業種': df_merged['Industry'],
+        'RS Rating': df_merged['RS_Rating'],
+        'Buy Pressure': df_merged['Buy_Pressure'],
+        'ステータス': df_merged['Status'],
+        '銘柄数': df_merged['銘柄数'].astype(int),
+        '平均テクニカルスコア': df_merged['平均テクニカルスコア'],
+        '平均スクリーニングスコア': df_merged['平均スクリーニングスコア'],
+        'BP_Color': df_merged['BP_Color'],  # チェックタブの着色用 (サマリー表には表示しない)
+    })
     df_summary = df_summary.sort_values('RS Rating', ascending=False)
     return df_summary
 
 
 df_summary = create_summary_data(df_screening_display, df_industry_display)
 
-tab0, tab0b, tab1, tab2, tab3 = st.tabs([
+# st.tabs は非表示のタブも含めて毎回すべて描画するため、ラジオボタンで選んだビューだけを描画する
+VIEW_LABELS = [
     "✅ チェック", "✅ チェック②",
     "📈 テクニカルスコア別マトリックス", "🎯 スクリーニングスコア別マトリックス", "📊 業種サマリー"
-])
+]
+active_view = st.radio("表示", VIEW_LABELS, horizontal=True, key='active_view', label_visibility='collapsed')
+
+
+STOCK_TABLE_CSS = """
+<style>
+.stock-table-wrap { max-height: 650px; overflow-y: auto; margin-bottom: 1rem; }
+.stock-table { width: 100%; border-collapse: collapse; font-size: 14px; }
+.stock-table th { background-color: #262730; color: #fafafa; padding: 6px 10px; text-align: left;
+                  border: 1px solid #444; position: sticky; top: 0; }
+.stock-table td { background-color: #000000; color: #fafafa; padding: 6px 10px; border: 1px solid #444; }
+.stock-table td.num { text-align: right; }
+.industry-metrics { display: flex; gap: 1rem; align-items: flex-start; margin-bottom: 1rem; }
+.industry-metrics .metric-label { font-size: 14px; color: #fafafa; }
+.industry-metrics .metric-value { font-size: 2.25rem; line-height: 1.4; color: #fafafa; }
+.industry-metrics .metric-status { font-weight: bold; padding-top: 0.25rem; }
+</style>
+"""
+
+
+def build_stock_table_html(stocks):
+    """銘柄テーブルを 1 つの HTML 文字列として組み立てる (Symbol と Buy Pressure は BP カラーで着色)"""
+    rows = []
+    for no, (symbol, company, ts, ss, bp, color) in enumerate(zip(
+        stocks['Symbol_HTML'], stocks['Company_Name_HTML'], stocks['Technical_Score'], stocks['Screening_Score'],
+        stocks['Buy_Pressure'], stocks['BP_Color'],
+    ), start=1):
+        rows.append(
+            f'<tr><td class="num">{no}</td>'
+            f'<td style="color: {color}; font-weight: bold; font-size: 16px;">{symbol}</td>'
+            f'<td>{company}</td><td class="num">{ts}</td><td class="num">{ss}</td>'
+            f'<td class="num" style="color: {color}; font-weight: bold;">{bp:.4f}</td></tr>'
+        )
+    return (
+        '<div class="stock-table-wrap"><table class="stock-table"><thead><tr>'
+        '<th>No</th><th>Symbol</th><th>Company Name</th><th>Technical Score</th>'
+        '<th>Screening Score</th><th>Buy Pressure</th>'
+        '</tr></thead><tbody>' + ''.join(rows) + '</tbody></table></div>'
+    )
 
 
-def style_symbol(row):
-    styles = [''] * len(row)
-    try:
-        bp = float(row['Buy Pressure'])
-        color = get_color_from_buy_pressure(bp)
-        symbol_idx = row.index.get_loc('Symbol')
-        styles[symbol_idx] = f'background-color: #000000; color: {color}; font-weight: bold; font-size: 16px;'
-        bp_idx = row.index.get_loc('Buy Pressure')
-        styles[bp_idx] = f'background-color: #000000; color: {color}; font-weight: bold;'
-    except (ValueError, TypeError, KeyError):
-        pass
-    return styles
-
-
-def style_symbol_black_bg(row):
-    """全セルの背景を黒にし、Symbol と Buy Pressure は BP カラーで着色"""
-    base = 'background-color: #000000; color: #fafafa;'
-    styles = [base] * len(row)
-    try:
-        bp = float(row['Buy Pressure'])
-        color = get_color_from_buy_pressure(bp)
-        symbol_idx = row.index.get_loc('Symbol')
-        styles[symbol_idx] = f'background-color: #000000; color: {color}; font-weight: bold; font-size: 16px;'
-        bp_idx = row.index.get_loc('Buy Pressure')
-        styles[bp_idx] = f'background-color: #000000; color: {color}; font-weight: bold;'
-    except (ValueError, TypeError, KeyError):
-        pass
-    return styles
+def build_industry_metrics_html(industry_name, rs_rating, buy_pressure, status):
+    """業種名・RS Rating・Buy Pressure・ステータスの見出し行を 1 つの HTML 文字列として組み立てる"""
+    metrics = (
+        (3, "業種", html.escape(str(industry_name))),
+        (1, "RS Rating", f"{rs_rating:.1f}"),
+        (1, "Buy Pressure", f"{buy_pressure:.3f}"),
+    )
+    cells = ''.join(
+        f'<div style="flex: {flex};"><div class="metric-label">{label}</div>'
+        f'<div class="metric-value">{value}</div></div>'
+        for flex, label, value in metrics
+    )
+    return (
+        f'<div class="industry-metrics">{cells}'
+        f'<div class="metric-status" style="flex: 2;">{html.escape(status)}</div></div>'
+    )
+
+
+MATRIX_SORT_COLUMNS = ('Technical_Score', 'Screening_Score')
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def sort_stocks_by_industry(df_screening_disp):
+    """ソート列 → {業種 → その列の降順に並べた銘柄 DataFrame} の辞書
+
+    テクニカル/スクリーニング両タブの並び順を 1 回の groupby でまとめて作る。
+    """
+    sorted_groups = {sort_by: {} for sort_by in MATRIX_SORT_COLUMNS}
+    for industry, stocks in df_screening_disp.groupby('Industry', sort=False, observed=True):
+        for sort_by in MATRIX_SORT_COLUMNS:
+            # 同点の銘柄はファイルの行順のまま並べる (スコアの dtype で並び順が変わらないよう安定ソート)
+            sorted_groups[sort_by][industry] = stocks.sort_values(sort_by, ascending=False, kind='stable')
+    return sorted_groups
 
 
 def create_industry_table(df_screening_disp, df_industry_disp, sort_by='Technical_Score'):
     df_industry_sorted = df_industry_disp.sort_values('RS_Rating', ascending=False)
-    for _, industry_row in df_industry_sorted.iterrows():
-        industry_name = industry_row['Industry']
-        rs_rating = industry_row['RS_Rating']
-        buy_pressure = industry_row['Buy_Pressure']
-        stocks_in_industry = df_screening_disp[
-            df_screening_disp['Industry'] == industry_name
-        ].sort_values(sort_by, ascending=False).head(max_stocks_per_industry)
-        if len(stocks_in_industry) == 0:
+    # 業種ごとのソート済み銘柄はキャッシュから取得し、ループ内では辞書引きのみ
+    stocks_by_industry = sort_stocks_by_industry(df_screening_disp)[sort_by]
+    # CSS・全業種の見出し/指標行/銘柄テーブル・区切り線を 1 つの Markdown にまとめ、1 回の st.markdown で送る
+    sections = []
+    statuses = df_industry_sorted['Status'].map(BUY_PRESSURE_STATUS_DISPLAY)
+    for industry_name, rs_rating, buy_pressure, status in zip(
+        df_industry_sorted['Industry'], df_industry_sorted['RS_Rating'],
+        df_industry_sorted['Buy_Pressure'], statuses,
+    ):
+        stocks_in_industry = stocks_by_industry.get(industry_name)
+        if stocks_in_industry is None:
             continue
-        st.markdown(f"### {industry_name}")
-        col1, col2, col3, col4 = st.columns([3, 1, 1, 2])
-        with col1:
-            st.metric("業種", industry_name)
-        with col2:
-            st.metric("RS Rating", f"{rs_rating:.1f}")
-        with col3:
-            st.metric("Buy Pressure", f"{buy_pressure:.3f}")
-        with col4:
-            status = get_buy_pressure_status_display(buy_pressure)
-            st.markdown(f"**{status}**")
-        display_df = stocks_in_industry[
-            ['Symbol', 'Company Name', 'Technical_Score', 'Screening_Score', 'Buy_Pressure']
-        ].copy()
-        display_df = display_df.reset_index(drop=True)
-        display_df.index = display_df.index + 1
-        display_df.index.name = 'No'
-        display_df.columns = ['Symbol', 'Company Name', 'Technical Score', 'Screening Score', 'Buy Pressure']
-        display_df['Company Name'] = display_df['Company Name'].apply(
-            lambda x: str(x)[:40] if pd.notna(x) else ''
+        stocks_in_industry = stocks_in_industry.head(max_stocks_per_industry)
+        sections.append(
+            f"### {html.escape(industry_name)}\n\n"
+            f"{build_industry_metrics_html(industry_name, rs_rating, buy_pressure, status)}\n\n"
+            f"{build_stock_table_html(stocks_in_industry)}"
         )
-        styled_df = display_df.style.apply(style_symbol_black_bg, axis=1)
-        st.dataframe(styled_df, use_container_width=True, height=min(len(display_df) * 40 + 50, 650))
-        st.markdown("---")
-
-
-def get_colored_symbols_html(industry, score, df_screening_disp):
-    stocks = df_screening_disp[
-        (df_screening_disp['Industry'] == industry) &
-        (df_screening_disp['Technical_Score'] == score)
-    ].sort_values('Buy_Pressure', ascending=False)
-    if len(stocks) == 0:
-        return '', ''
-    colored_spans = []
-    plain_symbols = []
-    for _, stock in stocks.iterrows():
-        symbol = html.escape(str(stock['Symbol']))
-        bp = stock['Buy_Pressure']
-        color = get_color_from_buy_pressure(bp)
-        colored_spans.append(f'<span style="color:{color}; font-weight:bold;">{symbol}</span>')
-        plain_symbols.append(symbol)
-    return ', '.join(colored_spans), ', '.join(plain_symbols)
-
-
-def get_colored_symbols_html_with_fs(industry, ts, fs, df_screening_disp):
-    stocks = df_screening_disp[
-        (df_screening_disp['Industry'] == industry) &
-        (df_screening_disp['Technical_Score'] == ts) &
-        (df_screening_disp['Fundamental_Score'] == fs)
-    ].sort_values('Buy_Pressure', ascending=False)
-    if len(stocks) == 0:
-        return '', ''
-    colored_spans = []
-    plain_symbols = []
-    for _, stock in stocks.iterrows():
-        symbol = html.escape(str(stock['Symbol']))
-        bp = stock['Buy_Pressure']
-        color = get_color_from_buy_pressure(bp)
-        colored_spans.append(
-            f'<span data-symbol="{symbol}" style="color:{color}; font-weight:bold;">{symbol}</span>'
-        )
-        plain_symbols.append(symbol)
-    return ', '.join(colored_spans), ', '.join(plain_symbols)
+    if sections:
+        sections.append("")
+    st.markdown(STOCK_TABLE_CSS + "\n\n" + "\n\n---\n\n".join(sections), unsafe_allow_html=True)
+
+
+def group_colored_symbols_html(df_screening_disp, keys, with_data_symbol=False):
+    """keys の値の組ごとの (Buy Pressure 降順の着色シンボル HTML, コピー用テキスト) の辞書
+
+    span の組み立ては列全体の文字列連結で行い、groupby ではカンマ区切りの join だけを行う。
+    """
+    stocks = df_screening_disp.sort_values('Buy_Pressure', ascending=False, kind='stable')
+    symbols = stocks['Symbol_HTML']
+    span_attrs = ('<span data-symbol="' + symbols + '" ') if with_data_symbol else '<span '
+    spans = span_attrs + 'style="color:' + stocks['BP_Color'] + '; font-weight:bold;">' + symbols + '</span>'
+    grouped = pd.DataFrame({'html': spans, 'copy': symbols}).groupby(
+        [stocks[key] for key in keys], sort=False, observed=True
+    ).agg(', '.join)
+    return dict(zip(grouped.index, zip(grouped['html'], grouped['copy'])))
 
 
 # ============================================================
 # チェックタブ用（従来版）
 # ============================================================
-def render_check_tab(df_check, df_screening_disp, table_id_suffix=""):
-    st.header("Buy Pressure")
-    max_symbols_per_row = []
-    for _, row in df_check.iterrows():
-        row_max = 0
-        for score in [14, 13, 12, 11, 10]:
-            count = len(df_screening_disp[
-                (df_screening_disp['Industry'] == row['業種']) &
-                (df_screening_disp['Technical_Score'] == score)
-            ])
-            row_max = max(row_max, count)
-        max_symbols_per_row.append(row_max)
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_check_table_html(df_check, df_screening_disp, table_id_suffix=""):
+    """チェックタブの表 HTML と表示高さ"""
+    # 業種×テクニカルスコアごとのセル内容は 1 回の groupby で求めて辞書引きする
+    cell_keys = ['Industry', 'Technical_Score']
+    symbols_by_cell = group_colored_symbols_html(df_screening_disp, cell_keys)
+    # 行の高さ用の各業種の最大銘柄数は、業種×スコアの銘柄数表の行方向の max で一括で求める
+    symbol_counts = (
+        df_screening_disp.groupby(cell_keys, observed=True).size()
+        .unstack(fill_value=0)
+        .reindex(index=df_check['業種'], columns=[14, 13, 12, 11, 10], fill_value=0)
+    )
+    max_symbols_per_row = symbol_counts.max(axis=1).to_numpy()
 
     tid = f"check-table{table_id_suffix}"
     toast_id = f"copy-toast{table_id_suffix}"
     func_name = f"copySymbols{table_id_suffix.replace('-', '_')}"
 
-    table_html = f"""
+    # 文字列の += 連結は行数に対して二乗で遅くなるため、部品をリストに集めて最後に join する
+    parts = [f"""
     <style>
     #{tid} {{ width: 100%; border-collapse: collapse; font-size: 13px; }}
     #{tid} th {{ background-color: #262730; color: #fafafa; padding: 8px 10px; text-align: left; border: 1px solid #444; }}
@@ -393,33 +575,30 @@ def render_check_tab(df_check, df_screening_disp, table_id_suffix=""):
         <th>業種</th><th>RS Rating</th><th>Buy Pressure</th><th>ステータス</th>
         <th>TS 14</th><th>TS 13</th><th>TS 12</th><th>TS 11</th><th>TS 10</th>
     </tr></thead><tbody>
-    """
-    for idx, row in df_check.iterrows():
-        bp = row['Buy Pressure']
-        bp_color = get_color_from_buy_pressure(bp)
-        industry = html.escape(str(row['業種']))
-        rs = f"{row['RS Rating']:.1f}"
-        bp_val = f"{bp:.3f}"
-        status_raw = str(row['ステータス'])
-        status_display = re.sub(r'^\d+[a-z]?\s+', '', status_raw)
-        status = html.escape(status_display)
-        table_html += f'<tr><td>{industry}</td><td>{rs}</td>'
-        table_html += f'<td style="color: {bp_color}; font-weight: bold;">{bp_val}</td>'
-        table_html += f'<td>{status}</td>'
-        for score in [14, 13, 12, 11, 10]:
-            display_html, copy_text = get_colored_symbols_html(row['業種'], score, df_screening_disp)
-            if display_html:
-                escaped_copy = html.escape(copy_text).replace("'", "\\'")
-                table_html += (
-                    f'<td class="copyable{table_id_suffix}" '
-                    f'onclick="{func_name}(this, \'{escaped_copy}\')" '
-                    f'title="クリックでコピー">{display_html}</td>'
-                )
-            else:
-                table_html += '<td></td>'
-        table_html += "</tr>"
-
-    table_html += f"""
+    """]
+    # 各行の HTML は列単位の文字列連結で組み立てる。銘柄セルはセルごとの <td> を先に作っておき、
+    # スコア列ごとに業種で辞書引きして連結する
+    cell_html = {}
+    for key, (display_html, copy_text) in symbols_by_cell.items():
+        escaped_copy = html.escape(copy_text).replace("'", "\\'")
+        cell_html[key] = (
+            f'<td class="copyable{table_id_suffix}" '
+            f'onclick="{func_name}(this, \'{escaped_copy}\')" '
+            f'title="クリックでコピー">{display_html}</td>'
+        )
+    statuses = df_check['ステータス'].astype(str).str.replace(STATUS_SORT_PREFIX_PATTERN, '', regex=True)
+    row_html = (
+        '<tr><td>' + df_check['業種'].astype(str).map(html.escape) + '</td>'
+        + '<td>' + df_check['RS Rating'].map('{:.1f}'.format).astype(str) + '</td>'
+        + '<td style="color: ' + df_check['BP_Color'] + '; font-weight: bold;">'
+        + df_check['Buy Pressure'].map('{:.3f}'.format).astype(str) + '</td>'
+        + '<td>' + statuses.map(html.escape) + '</td>'
+    )
+    for score in [14, 13, 12, 11, 10]:
+        row_html = row_html + [cell_html.get((industry, score), '<td></td>') for industry in df_check['業種']]
+    parts.extend(row_html + '</tr>')
+
+    parts.append(f"""
     </tbody></table></div>
     <script>
     function {func_name}(el, text) {{
@@ -431,384 +610,384 @@ def render_check_tab(df_check, df_screening_disp, table_id_suffix=""):
         }});
     }}
     </script>
-    """
-    total_height = 80
-    for sym_count in max_symbols_per_row:
-        if sym_count <= 3:
-            total_height += 40
-        elif sym_count <= 6:
-            total_height += 55
-        elif sym_count <= 10:
-            total_height += 75
-        else:
-            total_height += 95
+    """)
+    table_html = ''.join(parts)
+    # 行の高さは最大銘柄数の段階 (〜3 / 〜6 / 〜10 / それ以上) で決まる
+    row_heights = np.select(
+        [max_symbols_per_row <= 3, max_symbols_per_row <= 6, max_symbols_per_row <= 10], [40, 55, 75], default=95
+    )
+    total_height = 80 + int(row_heights.sum())
+    return table_html, total_height
+
+
+def render_check_tab(df_check, df_screening_disp, table_id_suffix=""):
+    st.header("Buy Pressure")
+    table_html, total_height = build_check_table_html(df_check, df_screening_disp, table_id_suffix)
     st.components.v1.html(table_html, height=total_height, scrolling=False)
 
 
 # ============================================================
 # チェック②タブ用（TS × FS 細分化 ＋ 縦横スクロール ＋ 銘柄検索）
 # ============================================================
-def render_check_tab_with_fs(df_check, df_screening_disp):
-    st.header("Buy Pressure（TS × FS 細分化）")
+# 固定列 (業種・RS Rating・Buy Pressure・ステータス) の幅と sticky の left 位置
+FS_CHECK_COL_WIDTHS = [200, 85, 110, 130]
+FS_CHECK_LEFT_POSITIONS = [sum(FS_CHECK_COL_WIDTHS[:i]) for i in range(len(FS_CHECK_COL_WIDTHS))]
+FS_CHECK_FROZEN_WIDTH = sum(FS_CHECK_COL_WIDTHS)
+FS_CHECK_HEADER_ROW_HEIGHT = 38
+
+FS_CHECK_TABLE_ID = "check-table-fs"
+FS_CHECK_TOAST_ID = "copy-toast-fs"
+FS_CHECK_COPY_FUNC = "copySymbolsFS"
+
+FS_CHECK_TS_HEADER_COLORS = {
+    14: "#1b3a1b",
+    13: "#2a4a1b",
+    12: "#3a3a1b",
+    11: "#4a3a1b",
+    10: "#3a2a1b",
+}
+
+# CSS と JS はデータに依存しないので、再実行のたびに組み立てず import 時に一度だけ作る
+FS_CHECK_STYLE_HTML = f"""
+<style>
+html, body {{
+    margin: 0;
+    padding: 0;
+    height: 100%;
+    overflow: hidden;
+}}
+.search-bar {{
+    position: sticky;
+    top: 0;
+    z-index: 10;
+    background-color: #0e1117;
+    padding: 10px 12px;
+    display: flex;
+    align-items: center;
+    gap: 10px;
+    border-bottom: 2px solid #444;
+}}
+.search-bar input {{
+    background-color: #1a1d24;
+    color: #fafafa;
+    border: 1px solid #555;
+    border-radius: 6px;
+    padding: 8px 14px;
+    font-size: 14px;
+    width: 260px;
+    outline: none;
+}}
+.search-bar input:focus {{
+    border-color: #00c853;
+    box-shadow: 0 0 6px rgba(0,200,83,0.4);
+}}
+.search-bar input::placeholder {{
+    color: #888;
+}}
+.search-bar button {{
+    background-color: #00c853;
+    color: #fff;
+    border: none;
+    border-radius: 6px;
+    padding: 8px 18px;
+    font-size: 14px;
+    font-weight: bold;
+    cursor: pointer;
+}}
+.search-bar button:hover {{
+    background-color: #00e676;
+}}
+.search-bar .clear-btn {{
+    background-color: #555;
+}}
+.search-bar .clear-btn:hover {{
+    background-color: #777;
+}}
+.search-bar .result-text {{
+    color: #aaa;
+    font-size: 13px;
+    margin-left: 8px;
+}}
+.fs-scroll-wrapper {{
+    overflow: auto;
+    height: calc(100vh - 60px);
+    border: 1px solid #444;
+}}
+#{FS_CHECK_TABLE_ID} {{
+    border-collapse: separate;
+    border-spacing: 0;
+    font-size: 13px;
+    width: max-content;
+}}
+#{FS_CHECK_TABLE_ID} th, #{FS_CHECK_TABLE_ID} td {{
+    padding: 8px 12px;
+    border: 1px solid #444;
+    background-color: #0e1117;
+    color: #fafafa;
+    white-space: nowrap;
+    line-height: 1.6;
+}}
+#{FS_CHECK_TABLE_ID} thead th {{
+    position: sticky;
+    z-index: 3;
+    background-color: #262730;
+}}
+#{FS_CHECK_TABLE_ID} thead tr:first-child th {{
+    top: 0;
+}}
+#{FS_CHECK_TABLE_ID} thead tr:nth-child(2) th {{
+    top: {FS_CHECK_HEADER_ROW_HEIGHT}px;
+}}
+#{FS_CHECK_TABLE_ID} .sticky-col {{
+    position: sticky;
+    z-index: 2;
+    background-color: #0e1117;
+}}
+#{FS_CHECK_TABLE_ID} thead .sticky-col {{
+    z-index: 5;
+    background-color: #262730;
+}}
+#{FS_CHECK_TABLE_ID} .sticky-col-0 {{ left: {FS_CHECK_LEFT_POSITIONS[0]}px; min-width: {FS_CHECK_COL_WIDTHS[0]}px; max-width: {FS_CHECK_COL_WIDTHS[0]}px; }}
+#{FS_CHECK_TABLE_ID} .sticky-col-1 {{ left: {FS_CHECK_LEFT_POSITIONS[1]}px; min-width: {FS_CHECK_COL_WIDTHS[1]}px; max-width: {FS_CHECK_COL_WIDTHS[1]}px; text-align: right; }}
+#{FS_CHECK_TABLE_ID} .sticky-col-2 {{ left: {FS_CHECK_LEFT_POSITIONS[2]}px; min-width: {FS_CHECK_COL_WIDTHS[2]}px; max-width: {FS_CHECK_COL_WIDTHS[2]}px; text-align: right; }}
+#{FS_CHECK_TABLE_ID} .sticky-col-3 {{ left: {FS_CHECK_LEFT_POSITIONS[3]}px; min-width: {FS_CHECK_COL_WIDTHS[3]}px; max-width: {FS_CHECK_COL_WIDTHS[3]}px;
+                        border-right: 3px solid #888; }}
+#{FS_CHECK_TABLE_ID} td.data-cell {{
+    min-width: 100px;
+}}
+#{FS_CHECK_TABLE_ID} tbody tr:hover td {{ background-color: #1a1d24; }}
+#{FS_CHECK_TABLE_ID} tbody tr:hover .sticky-col {{ background-color: #1a1d24; }}
+.copyable-fs {{ cursor: pointer; }}
+.copyable-fs:hover {{ background-color: #2a2d34 !important; }}
+#{FS_CHECK_TABLE_ID} td.search-hit {{
+    background-color: rgba(0, 200, 83, 0.18) !important;
+    box-shadow: inset 0 0 0 2px #00c853;
+}}
+#{FS_CHECK_TABLE_ID} td.search-hit .search-match {{
+    background-color: #00c853;
+    color: #000;
+    border-radius: 3px;
+    padding: 1px 4px;
+    animation: pulse-glow 1.2s ease-in-out 3;
+}}
+@keyframes pulse-glow {{
+    0%, 100% {{ box-shadow: 0 0 4px #00c853; }}
+    50% {{ box-shadow: 0 0 16px #00e676, 0 0 30px rgba(0,230,118,0.4); }}
+}}
+#{FS_CHECK_TOAST_ID} {{
+    position: fixed; top: 20px; right: 20px; background-color: #00c853; color: white;
+    padding: 10px 20px; border-radius: 8px; font-size: 14px; font-weight: bold;
+    z-index: 9999; opacity: 0; transition: opacity 0.3s; pointer-events: none;
+}}
+#{FS_CHECK_TOAST_ID}.show {{ opacity: 1; }}
+</style>
+"""
+
+FS_CHECK_SCRIPT_HTML = f"""
+<script>
+var FROZEN_WIDTH = {FS_CHECK_FROZEN_WIDTH};
+
+function {FS_CHECK_COPY_FUNC}(el, text) {{
+    navigator.clipboard.writeText(text).then(function() {{
+        var toast = document.getElementById('{FS_CHECK_TOAST_ID}');
+        toast.classList.add('show');
+        el.style.backgroundColor = '#1b5e20';
+        setTimeout(function() {{ toast.classList.remove('show'); el.style.backgroundColor = ''; }}, 1500);
+    }});
+}}
+
+function clearHighlights() {{
+    var table = document.getElementById('{FS_CHECK_TABLE_ID}');
+    if (!table) return;
+    var hitCells = table.querySelectorAll('td.search-hit');
+    hitCells.forEach(function(td) {{
+        td.classList.remove('search-hit');
+        var matchSpans = td.querySelectorAll('.search-match');
+        matchSpans.forEach(function(sp) {{
+            sp.classList.remove('search-match');
+        }});
+    }});
+    document.getElementById('search-result').textContent = '';
+}}
 
-    ts_values = sorted(df_screening_disp['Technical_Score'].unique(), reverse=True)
+function clearSearchAndInput() {{
+    document.getElementById('symbol-search').value = '';
+    clearHighlights();
+}}
 
-    # --- 修正: FS上限を10に固定 ---
-    global_max_fs = 10
-    global_min_fs = int(df_screening_disp['Fundamental_Score'].min())
-    fixed_fs_values = list(range(global_max_fs, global_min_fs - 1, -1))
+function scrollToCell(cell) {{
+    var wrapper = document.getElementById('fs-scroll-wrapper');
+    if (!wrapper || !cell) return;
 
-    ts_fs_map = {}
-    for ts in ts_values:
-        ts_fs_map[ts] = fixed_fs_values
-    # --- 修正ここまで ---
+    var wrapperRect = wrapper.getBoundingClientRect();
 
-    all_sub_cols = []
-    for ts in ts_values:
-        for fs in ts_fs_map[ts]:
-            all_sub_cols.append((ts, fs))
+    var cellOffsetLeft = cell.offsetLeft;
+    var targetScrollLeft = cellOffsetLeft - FROZEN_WIDTH - 20;
+    if (targetScrollLeft < 0) targetScrollLeft = 0;
 
-    num_rows = len(df_check)
+    var cellRect = cell.getBoundingClientRect();
+    var headerHeight = 80;
+    var targetScrollTop = wrapper.scrollTop + (cellRect.top - wrapperRect.top) - headerHeight;
+    if (targetScrollTop < 0) targetScrollTop = 0;
 
-    col_widths = [200, 85, 110, 130]
-    left_positions = []
-    cumulative = 0
-    for w in col_widths:
-        left_positions.append(cumulative)
-        cumulative += w
-    frozen_total_width = cumulative
-
-    tid = "check-table-fs"
-    toast_id = "copy-toast-fs"
-    func_name = "copySymbolsFS"
-
-    ts_header_colors = {
-        14: "#1b3a1b",
-        13: "#2a4a1b",
-        12: "#3a3a1b",
-        11: "#4a3a1b",
-        10: "#3a2a1b",
-    }
+    wrapper.scrollTo({{
+        top: targetScrollTop,
+        left: targetScrollLeft,
+        behavior: 'smooth'
+    }});
+}}
 
-    header_row_h = 38
+function searchSymbol() {{
+    var query = document.getElementById('symbol-search').value.trim().toUpperCase();
+    var resultEl = document.getElementById('search-result');
+    var table = document.getElementById('{FS_CHECK_TABLE_ID}');
 
-    style_css = f"""
-    <style>
-    html, body {{
-        margin: 0;
-        padding: 0;
-        height: 100%;
-        overflow: hidden;
-    }}
-    .search-bar {{
-        position: sticky;
-        top: 0;
-        z-index: 10;
-        background-color: #0e1117;
-        padding: 10px 12px;
-        display: flex;
-        align-items: center;
-        gap: 10px;
-        border-bottom: 2px solid #444;
-    }}
-    .search-bar input {{
-        background-color: #1a1d24;
-        color: #fafafa;
-        border: 1px solid #555;
-        border-radius: 6px;
-        padding: 8px 14px;
-        font-size: 14px;
-        width: 260px;
-        outline: none;
-    }}
-    .search-bar input:focus {{
-        border-color: #00c853;
-        box-shadow: 0 0 6px rgba(0,200,83,0.4);
-    }}
-    .search-bar input::placeholder {{
-        color: #888;
-    }}
-    .search-bar button {{
-        background-color: #00c853;
-        color: #fff;
-        border: none;
-        border-radius: 6px;
-        padding: 8px 18px;
-        font-size: 14px;
-        font-weight: bold;
-        cursor: pointer;
-    }}
-    .search-bar button:hover {{
-        background-color: #00e676;
-    }}
-    .search-bar .clear-btn {{
-        background-color: #555;
-    }}
-    .search-bar .clear-btn:hover {{
-        background-color: #777;
-    }}
-    .search-bar .result-text {{
-        color: #aaa;
-        font-size: 13px;
-        margin-left: 8px;
-    }}
-    .fs-scroll-wrapper {{
-        overflow: auto;
-        height: calc(100vh - 60px);
-        border: 1px solid #444;
-    }}
-    #{tid} {{
-        border-collapse: separate;
-        border-spacing: 0;
-        font-size: 13px;
-        width: max-content;
-    }}
-    #{tid} th, #{tid} td {{
-        padding: 8px 12px;
-        border: 1px solid #444;
-        background-color: #0e1117;
-        color: #fafafa;
-        white-space: nowrap;
-        line-height: 1.6;
-    }}
-    #{tid} thead th {{
-        position: sticky;
-        z-index: 3;
-        background-color: #262730;
-    }}
-    #{tid} thead tr:first-child th {{
-        top: 0;
-    }}
-    #{tid} thead tr:nth-child(2) th {{
-        top: {header_row_h}px;
-    }}
-    #{tid} .sticky-col {{
-        position: sticky;
-        z-index: 2;
-        background-color: #0e1117;
-    }}
-    #{tid} thead .sticky-col {{
-        z-index: 5;
-        background-color: #262730;
-    }}
-    #{tid} .sticky-col-0 {{ left: {left_positions[0]}px; min-width: {col_widths[0]}px; max-width: {col_widths[0]}px; }}
-    #{tid} .sticky-col-1 {{ left: {left_positions[1]}px; min-width: {col_widths[1]}px; max-width: {col_widths[1]}px; text-align: right; }}
-    #{tid} .sticky-col-2 {{ left: {left_positions[2]}px; min-width: {col_widths[2]}px; max-width: {col_widths[2]}px; text-align: right; }}
-    #{tid} .sticky-col-3 {{ left: {left_positions[3]}px; min-width: {col_widths[3]}px; max-width: {col_widths[3]}px;
-                            border-right: 3px solid #888; }}
-    #{tid} td.data-cell {{
-        min-width: 100px;
-    }}
-    #{tid} tbody tr:hover td {{ background-color: #1a1d24; }}
-    #{tid} tbody tr:hover .sticky-col {{ background-color: #1a1d24; }}
-    .copyable-fs {{ cursor: pointer; }}
-    .copyable-fs:hover {{ background-color: #2a2d34 !important; }}
-    #{tid} td.search-hit {{
-        background-color: rgba(0, 200, 83, 0.18) !important;
-        box-shadow: inset 0 0 0 2px #00c853;
-    }}
-    #{tid} td.search-hit .search-match {{
-        background-color: #00c853;
-        color: #000;
-        border-radius: 3px;
-        padding: 1px 4px;
-        animation: pulse-glow 1.2s ease-in-out 3;
-    }}
-    @keyframes pulse-glow {{
-        0%, 100% {{ box-shadow: 0 0 4px #00c853; }}
-        50% {{ box-shadow: 0 0 16px #00e676, 0 0 30px rgba(0,230,118,0.4); }}
-    }}
-    #{toast_id} {{
-        position: fixed; top: 20px; right: 20px; background-color: #00c853; color: white;
-        padding: 10px 20px; border-radius: 8px; font-size: 14px; font-weight: bold;
-        z-index: 9999; opacity: 0; transition: opacity 0.3s; pointer-events: none;
+    clearHighlights();
+    document.getElementById('symbol-search').value = query;
+
+    if (!query) {{
+        resultEl.textContent = '';
+        return;
     }}
-    #{toast_id}.show {{ opacity: 1; }}
-    </style>
-    """
 
-    table_html = style_css
-    table_html += f'<div id="{toast_id}" class="copy-toast">📋 Copied!</div>'
+    var keywords = query.split(/[,\\s]+/).filter(function(k) {{ return k.length > 0; }});
 
-    table_html += """
-    <div class="search-bar" id="search-bar-area">
-        <input type="text" id="symbol-search" placeholder="🔍 銘柄シンボルを入力 (例: AAPL)"
-               onkeydown="if(event.key==='Enter') searchSymbol();" />
-        <button onclick="searchSymbol()">検索</button>
-        <button class="clear-btn" onclick="clearSearchAndInput()">クリア</button>
-        <span id="search-result" class="result-text"></span>
-    </div>
-    """
+    var hitCount = 0;
+    var firstHit = null;
 
-    table_html += '<div class="fs-scroll-wrapper" id="fs-scroll-wrapper">'
-    table_html += f'<table id="{tid}">'
+    var allSpans = table.querySelectorAll('td.data-cell span[data-symbol]');
+    allSpans.forEach(function(span) {{
+        var sym = span.getAttribute('data-symbol').toUpperCase();
+        var matched = false;
+        for (var i = 0; i < keywords.length; i++) {{
+            if (sym === keywords[i]) {{
+                matched = true;
+                break;
+            }}
+        }}
+        if (matched) {{
+            span.classList.add('search-match');
+            var parentTd = span.closest('td');
+            if (parentTd && !parentTd.classList.contains('search-hit')) {{
+                parentTd.classList.add('search-hit');
+                hitCount++;
+                if (!firstHit) firstHit = parentTd;
+            }}
+        }}
+    }});
 
-    table_html += "<thead>"
-    table_html += "<tr>"
+    if (hitCount > 0) {{
+        resultEl.textContent = '✅ ' + hitCount + ' 件ヒット';
+        resultEl.style.color = '#00c853';
+        scrollToCell(firstHit);
+    }} else {{
+        resultEl.textContent = '❌ 該当なし';
+        resultEl.style.color = '#ff5252';
+    }}
+}}
+
+document.addEventListener('click', function(e) {{
+    var table = document.getElementById('{FS_CHECK_TABLE_ID}');
+    var searchBar = document.getElementById('search-bar-area');
+    var toast = document.getElementById('{FS_CHECK_TOAST_ID}');
+    if (table && table.contains(e.target)) return;
+    if (searchBar && searchBar.contains(e.target)) return;
+    if (toast && toast.contains(e.target)) return;
+    clearSearchAndInput();
+}});
+</script>
+"""
+
+
+def build_check_table_fs_header(ts_values, fs_values):
+    """チェック②タブの <thead> HTML と (TS, FS) のサブ列一覧 (TS・FS の値の組だけで決まる)"""
+    parts = ["<thead>", "<tr>"]
     for i, label in enumerate(["業種", "RS Rating", "Buy Pressure", "ステータス"]):
-        table_html += f'<th rowspan="2" class="sticky-col sticky-col-{i}">{label}</th>'
+        parts.append(f'<th rowspan="2" class="sticky-col sticky-col-{i}">{label}</th>')
     for ts in ts_values:
-        colspan = len(ts_fs_map[ts])
-        bg = ts_header_colors.get(ts, "#262730")
-        table_html += f'<th colspan="{colspan}" style="background-color:{bg}; text-align:center; font-size:14px;">TS {ts}</th>'
-    table_html += "</tr>"
-    table_html += "<tr>"
+        bg = FS_CHECK_TS_HEADER_COLORS.get(ts, "#262730")
+        parts.append(
+            f'<th colspan="{len(fs_values)}" style="background-color:{bg}; text-align:center; font-size:14px;">TS {ts}</th>'
+        )
+    parts.append("</tr>")
+    parts.append("<tr>")
     for ts in ts_values:
-        bg = ts_header_colors.get(ts, "#262730")
-        for fs in ts_fs_map[ts]:
-            table_html += f'<th style="background-color:{bg}; font-size:12px; text-align:center;">FS {fs}</th>'
-    table_html += "</tr>"
-    table_html += "</thead>"
-
-    table_html += "<tbody>"
-    for _, row in df_check.iterrows():
-        bp = row['Buy Pressure']
-        bp_color = get_color_from_buy_pressure(bp)
-        industry_name = str(row['業種'])
-        industry_esc = html.escape(industry_name)
-        rs = f"{row['RS Rating']:.1f}"
-        bp_val = f"{bp:.3f}"
-        status_raw = str(row['ステータス'])
-        status_display = re.sub(r'^\d+[a-z]?\s+', '', status_raw)
-        status = html.escape(status_display)
-
-        table_html += "<tr>"
-        table_html += f'<td class="sticky-col sticky-col-0">{industry_esc}</td>'
-        table_html += f'<td class="sticky-col sticky-col-1">{rs}</td>'
-        table_html += f'<td class="sticky-col sticky-col-2" style="color:{bp_color}; font-weight:bold;">{bp_val}</td>'
-        table_html += f'<td class="sticky-col sticky-col-3">{status}</td>'
-
-        for ts, fs in all_sub_cols:
-            display_html, copy_text = get_colored_symbols_html_with_fs(
-                industry_name, ts, fs, df_screening_disp
-            )
-            if display_html:
-                escaped_copy = html.escape(copy_text).replace("'", "\\'")
-                table_html += (
-                    f'<td class="data-cell copyable-fs" '
-                    f'onclick="{func_name}(this, \'{escaped_copy}\')" '
-                    f'title="クリックでコピー">{display_html}</td>'
-                )
-            else:
-                table_html += '<td class="data-cell"></td>'
-        table_html += "</tr>"
-
-    table_html += "</tbody></table></div>"
-
-    table_html += f"""
-    <script>
-    var FROZEN_WIDTH = {frozen_total_width};
-
-    function {func_name}(el, text) {{
-        navigator.clipboard.writeText(text).then(function() {{
-            var toast = document.getElementById('{toast_id}');
-            toast.classList.add('show');
-            el.style.backgroundColor = '#1b5e20';
-            setTimeout(function() {{ toast.classList.remove('show'); el.style.backgroundColor = ''; }}, 1500);
-        }});
-    }}
-
-    function clearHighlights() {{
-        var table = document.getElementById('{tid}');
-        if (!table) return;
-        var hitCells = table.querySelectorAll('td.search-hit');
-        hitCells.forEach(function(td) {{
-            td.classList.remove('search-hit');
-            var matchSpans = td.querySelectorAll('.search-match');
-            matchSpans.forEach(function(sp) {{
-                sp.classList.remove('search-match');
-            }});
-        }});
-        document.getElementById('search-result').textContent = '';
-    }}
-
-    function clearSearchAndInput() {{
-        document.getElementById('symbol-search').value = '';
-        clearHighlights();
-    }}
-
-    function scrollToCell(cell) {{
-        var wrapper = document.getElementById('fs-scroll-wrapper');
-        if (!wrapper || !cell) return;
-
-        var wrapperRect = wrapper.getBoundingClientRect();
-
-        var cellOffsetLeft = cell.offsetLeft;
-        var targetScrollLeft = cellOffsetLeft - FROZEN_WIDTH - 20;
-        if (targetScrollLeft < 0) targetScrollLeft = 0;
-
-        var cellRect = cell.getBoundingClientRect();
-        var headerHeight = 80;
-        var targetScrollTop = wrapper.scrollTop + (cellRect.top - wrapperRect.top) - headerHeight;
-        if (targetScrollTop < 0) targetScrollTop = 0;
-
-        wrapper.scrollTo({{
-            top: targetScrollTop,
-            left: targetScrollLeft,
-            behavior: 'smooth'
-        }});
-    }}
-
-    function searchSymbol() {{
-        var query = document.getElementById('symbol-search').value.trim().toUpperCase();
-        var resultEl = document.getElementById('search-result');
-        var table = document.getElementById('{tid}');
-
-        clearHighlights();
-        document.getElementById('symbol-search').value = query;
+        bg = FS_CHECK_TS_HEADER_COLORS.get(ts, "#262730")
+        for fs in fs_values:
+            parts.append(f'<th style="background-color:{bg}; font-size:12px; text-align:center;">FS {fs}</th>')
+    parts.append("</tr>")
+    parts.append("</thead>")
+    all_sub_cols = [(ts, fs) for ts in ts_values for fs in fs_values]
+    return ''.join(parts), all_sub_cols
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_check_table_fs_html(df_check, df_screening_disp):
+    """チェック②タブの表 HTML と iframe の高さ"""
+    ts_values = tuple(sorted(df_screening_disp['Technical_Score'].unique().tolist(), reverse=True))
+    # FS の上限は 10 に固定し、全 TS で同じ FS 列を並べる
+    global_min_fs = int(df_screening_disp['Fundamental_Score'].min())
+    fs_values = tuple(range(10, global_min_fs - 1, -1))
+    thead_html, all_sub_cols = build_check_table_fs_header(ts_values, fs_values)
 
-        if (!query) {{
-            resultEl.textContent = '';
-            return;
-        }}
+    num_rows = len(df_check)
+    symbols_by_cell = group_colored_symbols_html(
+        df_screening_disp, ['Industry', 'Technical_Score', 'Fundamental_Score'], with_data_symbol=True
+    )
 
-        var keywords = query.split(/[,\\s]+/).filter(function(k) {{ return k.length > 0; }});
+    parts = [FS_CHECK_STYLE_HTML]
+    parts.append(f'<div id="{FS_CHECK_TOAST_ID}" class="copy-toast">📋 Copied!</div>')
 
-        var hitCount = 0;
-        var firstHit = null;
+    parts.append("""
+    <div class="search-bar" id="search-bar-area">
+        <input type="text" id="symbol-search" placeholder="🔍 銘柄シンボルを入力 (例: AAPL)"
+               onkeydown="if(event.key==='Enter') searchSymbol();" />
+        <button onclick="searchSymbol()">検索</button>
+        <button class="clear-btn" onclick="clearSearchAndInput()">クリア</button>
+        <span id="search-result" class="result-text"></span>
+    </div>
+    """)
+
+    parts.append('<div class="fs-scroll-wrapper" id="fs-scroll-wrapper">')
+    parts.append(f'<table id="{FS_CHECK_TABLE_ID}">')
+
+    parts.append(thead_html)
+
+    parts.append("<tbody>")
+    # 固定列の表示文字列は行ループの前に列単位で一括で整形しておく
+    industry_names = df_check['業種'].astype(str)
+    row_values = zip(
+        industry_names,
+        industry_names.map(html.escape),
+        df_check['RS Rating'].map('{:.1f}'.format),
+        df_check['Buy Pressure'].map('{:.3f}'.format),
+        df_check['ステータス'].astype(str).str.replace(STATUS_SORT_PREFIX_PATTERN, '', regex=True).map(html.escape),
+        df_check['BP_Color'],
+    )
+    # 銘柄セルの <td> は銘柄のあるセルごとに先に作っておき、行ではセルを辞書引きして連結する
+    cell_html = {}
+    for key, (display_html, copy_text) in symbols_by_cell.items():
+        escaped_copy = html.escape(copy_text).replace("'", "\\'")
+        cell_html[key] = (
+            f'<td class="data-cell copyable-fs" '
+            f'onclick="{FS_CHECK_COPY_FUNC}(this, \'{escaped_copy}\')" '
+            f'title="クリックでコピー">{display_html}</td>'
+        )
+    for industry_name, industry_esc, rs, bp_val, status, bp_color in row_values:
+        parts.append(
+            f'<tr><td class="sticky-col sticky-col-0">{industry_esc}</td>'
+            f'<td class="sticky-col sticky-col-1">{rs}</td>'
+            f'<td class="sticky-col sticky-col-2" style="color:{bp_color}; font-weight:bold;">{bp_val}</td>'
+            f'<td class="sticky-col sticky-col-3">{status}</td>'
+            + ''.join(cell_html.get((industry_name, ts, fs), '<td class="data-cell"></td>') for ts, fs in all_sub_cols)
+            + '</tr>'
+        )
 
-        var allSpans = table.querySelectorAll('td.data-cell span[data-symbol]');
-        allSpans.forEach(function(span) {{
-            var sym = span.getAttribute('data-symbol').toUpperCase();
-            var matched = false;
-            for (var i = 0; i < keywords.length; i++) {{
-                if (sym === keywords[i]) {{
-                    matched = true;
-                    break;
-                }}
-            }}
-            if (matched) {{
-                span.classList.add('search-match');
-                var parentTd = span.closest('td');
-                if (parentTd && !parentTd.classList.contains('search-hit')) {{
-                    parentTd.classList.add('search-hit');
-                    hitCount++;
-                    if (!firstHit) firstHit = parentTd;
-                }}
-            }}
-        }});
+    parts.append("</tbody></table></div>")
 
-        if (hitCount > 0) {{
-            resultEl.textContent = '✅ ' + hitCount + ' 件ヒット';
-            resultEl.style.color = '#00c853';
-            scrollToCell(firstHit);
-        }} else {{
-            resultEl.textContent = '❌ 該当なし';
-            resultEl.style.color = '#ff5252';
-        }}
-    }}
+    parts.append(FS_CHECK_SCRIPT_HTML)
 
-    document.addEventListener('click', function(e) {{
-        var table = document.getElementById('{tid}');
-        var searchBar = document.getElementById('search-bar-area');
-        var toast = document.getElementById('{toast_id}');
-        if (table && table.contains(e.target)) return;
-        if (searchBar && searchBar.contains(e.target)) return;
-        if (toast && toast.contains(e.target)) return;
-        clearSearchAndInput();
-    }});
-    </script>
-    """
+    table_html = ''.join(parts)
 
     row_height = 42
     header_height = 90
@@ -816,31 +995,92 @@ def render_check_tab_with_fs(df_check, df_screening_disp):
     padding = 20
     calculated = search_bar_height + header_height + num_rows * row_height + padding
     iframe_height = min(calculated, 2000)
+    return table_html, iframe_height
 
+
+def render_check_tab_with_fs(df_check, df_screening_disp):
+    st.header("Buy Pressure（TS × FS 細分化）")
+    table_html, iframe_height = build_check_table_fs_html(df_check, df_screening_disp)
     st.components.v1.html(table_html, height=iframe_height, scrolling=True)
 
 
+STATUS_COLOR_MAP = {
+    '0a 💀 WEAK':      '#636EFA',
+    '0b ⚠️ CAUTION':   '#EF553B',
+    '0c ➖ NEUTRAL':    '#00CC96',
+    '1 📈 BUY':        '#1a3ab5',
+    '2 🚀 STRONG':     '#6fa8dc',
+    '3 🔥 EXTREME':    '#d84315',
+}
+
+STATUS_ORDER = [
+    '0a 💀 WEAK',
+    '0b ⚠️ CAUTION',
+    '0c ➖ NEUTRAL',
+    '1 📈 BUY',
+    '2 🚀 STRONG',
+    '3 🔥 EXTREME',
+]
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_rs_bp_scatter(df_summary):
+    """業種別 RS Rating vs Buy Pressure の散布図"""
+    fig = px.scatter(
+        df_summary, x='RS Rating', y='Buy Pressure', size='銘柄数', color='ステータス',
+        # 業種は text 経由でホバーに出るため customdata には平均テクニカルスコアだけを載せる
+        hover_data={'平均テクニカルスコア': ':.1f'}, text='業種', title='業種別 RS Rating vs Buy Pressure',
+        color_discrete_map=STATUS_COLOR_MAP,
+        category_orders={'ステータス': STATUS_ORDER},
+        render_mode='webgl',  # Scattergl トレースで描画 (点数に依らず描画コストがほぼ一定)
+    )
+    fig.update_traces(textposition='top center')
+    fig.update_layout(height=700, yaxis=dict(range=[0.5, 1]))
+    return fig
+
+
+# セクター数 (12 前後) 分の図が 1 回の表示で並ぶため、他より多めに保持する
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_sector_bp_bar(df_sector):
+    """セクター内の業種別 Buy Pressure 横棒グラフ (RS Rating で着色)"""
+    fig = px.bar(
+        df_sector, x='Buy_Pressure', y='Industry', orientation='h', color='RS_Rating',
+        color_continuous_scale=CUSTOM_RS_COLORSCALE, range_color=[0, 100],
+        labels={'Buy_Pressure': 'Buy Pressure', 'Industry': '業種', 'RS_Rating': 'RS Rating'},
+    )
+    fig.add_vline(
+        x=0.550, line_dash="dot", line_color="black", line_width=2,
+        annotation_text="BUY (0.550)", annotation_position="top",
+        annotation_font_size=11, annotation_font_color="black",
+    )
+    fig.update_layout(
+        height=max(len(df_sector) * 30 + 80, 150), yaxis=dict(dtick=1),
+        coloraxis_colorbar=dict(title='RS Rating'), margin=dict(t=40, b=20), showlegend=False,
+    )
+    return fig
+
+
 # ============================================================
-with tab0:
-    df_check = df_summary[['業種', 'RS Rating', 'Buy Pressure', 'ステータス']].copy()
+if active_view == VIEW_LABELS[0]:
+    df_check = df_summary[['業種', 'RS Rating', 'Buy Pressure', 'ステータス', 'BP_Color']]
     render_check_tab(df_check, df_screening_display, table_id_suffix="")
 
-with tab0b:
-    df_check2 = df_summary[['業種', 'RS Rating', 'Buy Pressure', 'ステータス']].copy()
+elif active_view == VIEW_LABELS[1]:
+    df_check2 = df_summary[['業種', 'RS Rating', 'Buy Pressure', 'ステータス', 'BP_Color']]
     render_check_tab_with_fs(df_check2, df_screening_display)
 
-with tab1:
+elif active_view == VIEW_LABELS[2]:
     st.header("テクニカルスコア別 業種×銘柄マトリックス")
     create_industry_table(df_screening_display, df_industry_display, sort_by='Technical_Score')
 
-with tab2:
+elif active_view == VIEW_LABELS[3]:
     st.header("スクリーニングスコア (テクニカル+ファンダメンタル) 別 業種×銘柄マトリックス")
     create_industry_table(df_screening_display, df_industry_display, sort_by='Screening_Score')
 
-with tab3:
+elif active_view == VIEW_LABELS[4]:
     st.header("業種別サマリー統計")
     st.dataframe(
-        df_summary, use_container_width=True, height=600,
+        df_summary.drop(columns='BP_Color'), use_container_width=True, height=600,
         column_config={
             'ステータス': st.column_config.TextColumn('ステータス', help='クリックでソート', width='medium'),
         },
@@ -848,64 +1088,23 @@ with tab3:
 
     st.subheader("RS Rating vs Buy Pressure")
 
-    STATUS_COLOR_MAP = {
-        '0a 💀 WEAK':      '#636EFA',
-        '0b ⚠️ CAUTION':   '#EF553B',
-        '0c ➖ NEUTRAL':    '#00CC96',
-        '1 📈 BUY':        '#1a3ab5',
-        '2 🚀 STRONG':     '#6fa8dc',
-        '3 🔥 EXTREME':    '#d84315',
-    }
-
-    STATUS_ORDER = [
-        '0a 💀 WEAK',
-        '0b ⚠️ CAUTION',
-        '0c ➖ NEUTRAL',
-        '1 📈 BUY',
-        '2 🚀 STRONG',
-        '3 🔥 EXTREME',
-    ]
-
-    fig = px.scatter(
-        df_summary, x='RS Rating', y='Buy Pressure', size='銘柄数', color='ステータス',
-        hover_data=['業種', '平均テクニカルスコア'], text='業種', title='業種別 RS Rating vs Buy Pressure',
-        color_discrete_map=STATUS_COLOR_MAP,
-        category_orders={'ステータス': STATUS_ORDER},
-    )
-    fig.update_traces(textposition='top center')
-    fig.update_layout(height=700, yaxis=dict(range=[0.5, 1]))
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(build_rs_bp_scatter(df_summary), use_container_width=True)
 
     st.subheader("業種別BPランキング")
-    df_bp_ranking = df_all_industry.copy()
-    df_bp_ranking['Sector'] = df_bp_ranking['Industry'].map(industry_sector_map).fillna('Unknown')
-    sector_avg_bp = df_bp_ranking.groupby('Sector')['Buy_Pressure'].mean().sort_values(ascending=False)
-    sorted_sectors = sector_avg_bp.index.tolist()
-
-    for sector in sorted_sectors:
-        df_sector = df_bp_ranking[df_bp_ranking['Sector'] == sector].copy()
-        df_sector = df_sector.sort_values('RS_Rating', ascending=True)
-        if len(df_sector) == 0:
-            continue
-        sector_avg = df_sector['Buy_Pressure'].mean()
-        rs80_count = len(df_sector[df_sector['RS_Rating'] >= 80])
-        total_count = len(df_sector)
+    df_bp_ranking = df_all_industry.assign(
+        Sector=df_all_industry['Industry'].map(industry_sector_map).fillna('Unknown')
+    )
+    # セクターごとの行と見出し用の集計 (平均 BP・RS≧80 の数・業種数) は 1 回の groupby で求め、
+    # ループ内では平均 BP 順にグループと集計行を取り出すだけにする
+    sector_groups = df_bp_ranking.groupby('Sector')
+    sector_stats = df_bp_ranking.assign(RS80=df_bp_ranking['RS_Rating'] >= 80).groupby('Sector').agg(
+        avg_bp=('Buy_Pressure', 'mean'), rs80=('RS80', 'sum'), total=('Industry', 'size'),
+    ).sort_values('avg_bp', ascending=False)
+
+    for sector, sector_avg, rs80_count, total_count in sector_stats.itertuples(name=None):
+        df_sector = sector_groups.get_group(sector).sort_values('RS_Rating', ascending=True)
         st.markdown(f"#### 📂 {sector}（平均BP: {sector_avg:.3f}　RS≧80: {rs80_count}/{total_count}）")
-        fig_sector = px.bar(
-            df_sector, x='Buy_Pressure', y='Industry', orientation='h', color='RS_Rating',
-            color_continuous_scale=CUSTOM_RS_COLORSCALE, range_color=[0, 100],
-            labels={'Buy_Pressure': 'Buy Pressure', 'Industry': '業種', 'RS_Rating': 'RS Rating'},
-        )
-        fig_sector.add_vline(
-            x=0.550, line_dash="dot", line_color="black", line_width=2,
-            annotation_text="BUY (0.550)", annotation_position="top",
-            annotation_font_size=11, annotation_font_color="black",
-        )
-        fig_sector.update_layout(
-            height=max(len(df_sector) * 30 + 80, 150), yaxis=dict(dtick=1),
-            coloraxis_colorbar=dict(title='RS Rating'), margin=dict(t=40, b=20), showlegend=False,
-        )
-        st.plotly_chart(fig_sector, use_container_width=True)
+        st.plotly_chart(build_sector_bp_bar(df_sector), use_container_width=True)
 
 st.markdown("---")
 st.markdown(
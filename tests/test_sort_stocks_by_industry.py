@@ -0,0 +1,45 @@
+import ast
+from pathlib import Path
+
+import pandas as pd
+
+APP_PATH = Path(__file__).resolve().parent.parent / "app.py"
+
+
+def load_app_definitions(*names):
+    """app.py は import すると画面全体を描画するスクリプトなので、指定した定義だけを取り出して実行する"""
+    tree = ast.parse(APP_PATH.read_text(encoding="utf-8"))
+    nodes = []
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name in names:
+            node.decorator_list = []  # st.cache_data は外す
+            nodes.append(node)
+        elif isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id in names for target in node.targets
+        ):
+            nodes.append(node)
+    namespace = {"pd": pd}
+    exec(compile(ast.Module(body=nodes, type_ignores=[]), str(APP_PATH), "exec"), namespace)
+    return namespace
+
+
+def test_tied_scores_keep_file_order():
+    app = load_app_definitions("MATRIX_SORT_COLUMNS", "sort_stocks_by_industry")
+    # load_data と同じく int8 に落としたスコアで、同点が多数ある (16 行を超える) 業種
+    technical = [10, 12, 11, 12, 10, 14, 11, 12, 10, 13] * 4
+    screening = [score + offset for score, offset in zip(technical, [3, 1, 2, 2, 0, 1, 3, 0, 2, 1] * 4)]
+    df = pd.DataFrame({
+        'Symbol': [f"S{i:02d}" for i in range(len(technical))],
+        'Industry': pd.Categorical(['Steel'] * len(technical)),
+        'Technical_Score': pd.Series(technical, dtype='int8'),
+        'Screening_Score': pd.Series(screening, dtype='int8'),
+    })
+
+    sorted_groups = app["sort_stocks_by_industry"](df)
+
+    for sort_by in app["MATRIX_SORT_COLUMNS"]:
+        # スコア降順、同点はファイル (行) の順
+        expected = [
+            symbol for _, _, symbol in sorted(zip(-df[sort_by].astype(int), df.index, df['Symbol']))
+        ]
+        assert sorted_groups[sort_by]['Steel']['Symbol'].tolist() == expected